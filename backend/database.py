@@ -1,62 +1,197 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from fastapi import Depends
-from dotenv import load_dotenv
 from pathlib import Path
 
-# Load environment variables
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+logger = logging.getLogger(__name__)
+
+# Indexes as (collection, keys, options); changing this list changes INDEX_SPEC_HASH
+INDEX_SPECS = [
+    # Players collection indexes
+    ("players", "username", {"unique": True}),
+    ("players", "email", {"unique": True, "sparse": True}),
+    ("players", "highest_score", {}),
+    ("players", "created_at", {}),
+
+    # Game states collection indexes
+    ("game_states", [("player_id", 1), ("is_active", 1)], {}),
+    ("game_states", "timestamp", {}),
+
+    # Game sessions collection indexes
+    ("game_sessions", "player_id", {}),
+    ("game_sessions", "score", {}),
+    ("game_sessions", "timestamp", {}),
+
+    # Leaderboard collection indexes
+    ("leaderboard", "player_id", {"unique": True}),
+    ("leaderboard", [("score", -1), ("timestamp", 1)], {}),
+
+    # Game statistics collection indexes
+    ("game_statistics", "player_id", {"unique": True}),
+    ("game_statistics", "highest_score", {}),
+
+    # Game imports collection indexes
+    ("game_imports", "player_id", {}),
+    ("game_imports", "import_timestamp", {}),
+]
+
+INDEX_SPEC_HASH = hashlib.sha256(
+    json.dumps(INDEX_SPECS, sort_keys=True).encode()
+).hexdigest()
+
+INDEX_INIT_MODES = ('eager', 'deferred', 'off')
+
+_env_loaded = False
+_client = None
+_db = None
+_index_task = None
+
+
+def load_environment():
+    """Load variables from backend/.env once per process"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv(ROOT_DIR / '.env')
+        _env_loaded = True
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Get the shared MongoDB client, creating it on first use"""
+    global _client
+    if _client is None:
+        load_environment()
+        _client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    return _client
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'neon_snake_db')]
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Get the application database, creating the client on first use"""
+    global _db
+    if _db is None:
+        _db = get_client()[os.environ.get('DB_NAME', 'neon_snake_db')]
+    return _db
 
 
 async def get_database() -> AsyncIOMotorDatabase:
     """Dependency to get database instance"""
-    return db
+    return get_db()
 
 
-async def init_database():
-    """Initialize database with indexes and collections"""
+def _index_name(keys) -> str:
+    """Default MongoDB name for an index on ``keys``"""
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+async def _missing_indexes(db: AsyncIOMotorDatabase) -> list:
+    """List the INDEX_SPECS entries that do not exist in the database"""
+    collections = sorted({collection for collection, _, _ in INDEX_SPECS})
+    infos = await asyncio.gather(*(db[c].index_information() for c in collections))
+    existing = dict(zip(collections, infos))
+
+    missing = []
+    for collection, keys, options in INDEX_SPECS:
+        info = existing[collection].get(_index_name(keys))
+        if info is None or any(info.get(opt, False) != value for opt, value in options.items()):
+            missing.append((collection, keys))
+    return missing
+
+
+async def ensure_indexes(force: bool = False) -> bool:
+    """Create all indexes concurrently unless the stored spec hash is current
+
+    A matching hash is only trusted if every index still exists, so dropped
+    collections or indexes are recreated. Returns True if indexes were (re)created.
+    """
+    db = get_db()
+    if not force:
+        stored = await db.schema_meta.find_one({"_id": "indexes"})
+        if stored and stored.get("hash") == INDEX_SPEC_HASH:
+            missing = await _missing_indexes(db)
+            if not missing:
+                return False
+            for collection, keys in missing:
+                logger.warning(f"Index {keys} on {collection} is missing; recreating indexes")
+
+    results = await asyncio.gather(*(
+        db[collection].create_index(keys, **options)
+        for collection, keys, options in INDEX_SPECS
+    ), return_exceptions=True)
+
+    failed = [
+        (collection, keys, result)
+        for (collection, keys, _), result in zip(INDEX_SPECS, results)
+        if isinstance(result, Exception)
+    ]
+    for collection, keys, error in failed:
+        logger.error(f"Failed to create index {keys} on {collection}: {error}")
+    if failed:
+        # Leave the hash unrecorded so the next startup retries
+        raise RuntimeError(f"{len(failed)} of {len(INDEX_SPECS)} indexes could not be created")
+
+    await db.schema_meta.update_one(
+        {"_id": "indexes"},
+        {"$set": {"hash": INDEX_SPEC_HASH}},
+        upsert=True
+    )
+    return True
+
+
+async def _ensure_indexes_logged():
     try:
-        # Create indexes for better performance
-        
-        # Players collection indexes
-        await db.players.create_index("username", unique=True)
-        await db.players.create_index("email", unique=True, sparse=True)
-        await db.players.create_index("highest_score")
-        await db.players.create_index("created_at")
-        
-        # Game states collection indexes
-        await db.game_states.create_index([("player_id", 1), ("is_active", 1)])
-        await db.game_states.create_index("timestamp")
-        
-        # Game sessions collection indexes
-        await db.game_sessions.create_index("player_id")
-        await db.game_sessions.create_index("score")
-        await db.game_sessions.create_index("timestamp")
-        
-        # Leaderboard collection indexes
-        await db.leaderboard.create_index("player_id", unique=True)
-        await db.leaderboard.create_index([("score", -1), ("timestamp", 1)])
-        
-        # Game statistics collection indexes
-        await db.game_statistics.create_index("player_id", unique=True)
-        await db.game_statistics.create_index("highest_score")
-        
-        # Game imports collection indexes
-        await db.game_imports.create_index("player_id")
-        await db.game_imports.create_index("import_timestamp")
-        
-        print("Database initialized successfully with indexes")
-        
+        created = await ensure_indexes()
+        if created:
+            logger.info("Database initialized successfully with indexes")
+        else:
+            logger.info("Database indexes up to date, skipped creation")
     except Exception as e:
-        print(f"Database initialization error: {e}")
+        logger.error(
+            f"Database initialization error: {e}. "
+            "Without the unique players.username index duplicate usernames are accepted"
+        )
+
+
+async def init_database():
+    """Initialize database indexes according to INDEX_INIT_MODE
+
+    - ``eager`` (default): create indexes before serving traffic
+    - ``deferred``: create indexes in the background after startup
+    - ``off``: leave indexes to be managed elsewhere
+    """
+    global _index_task
+    load_environment()
+    mode = os.environ.get('INDEX_INIT_MODE', 'eager').lower()
+    if mode not in INDEX_INIT_MODES:
+        logger.warning(
+            f"Unknown INDEX_INIT_MODE {mode!r}, expected one of {', '.join(INDEX_INIT_MODES)}; using 'eager'"
+        )
+        mode = 'eager'
+
+    if mode == 'off':
+        logger.warning(
+            "Database index creation disabled; the unique players.username index "
+            "must be managed elsewhere or duplicate usernames are accepted"
+        )
+    elif mode == 'deferred':
+        logger.warning("Creating database indexes in the background; usernames are not unique until it finishes")
+        _index_task = asyncio.ensure_future(_ensure_indexes_logged())
+    else:
+        await _ensure_indexes_logged()
 
 
 async def close_database():
     """Close database connection"""
-    client.close()
\ No newline at end of file
+    global _client, _db
+    if _index_task is not None and not _index_task.done():
+        _index_task.cancel()
+    if _client is not None:
+        _client.close()
+        _client = None
+        _db = None
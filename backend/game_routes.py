@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from typing import List, Optional
 from datetime import datetime
 import os
@@ -14,37 +16,46 @@ from models import (
     GameExport, GameImport, ApiResponse
 )
 from database import get_database
+from player_cache import PlayerCache, get_player_cache
 
 router = APIRouter(prefix="/api/game", tags=["game"])
 
 
 # Player Management
 @router.post("/players", response_model=Player)
-async def create_player(player_data: PlayerCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def create_player(player_data: PlayerCreate, db: AsyncIOMotorDatabase = Depends(get_database),
+                        cache: PlayerCache = Depends(get_player_cache)):
     """Create a new player profile"""
     try:
-        # Check if username already exists
-        existing_player = await db.players.find_one({"username": player_data.username})
-        if existing_player:
-            raise HTTPException(status_code=400, detail="Username already exists")
-        
         player = Player(**player_data.dict())
-        await db.players.insert_one(player.dict())
+        # Leave out a missing email: the sparse unique index only skips absent fields
+        player_doc = player.dict(exclude_none=True)
+        try:
+            # The unique indexes on username/email reject duplicates
+            await db.players.insert_one(player_doc)
+        except DuplicateKeyError as e:
+            key_pattern = (e.details or {}).get("keyPattern", {})
+            field = "Email" if "email" in key_pattern else "Username"
+            raise HTTPException(status_code=400, detail=f"{field} already exists")
+        cache.put(player_doc)
         
         # Create initial statistics
         stats = GameStatistics(player_id=player.id)
         await db.game_statistics.insert_one(stats.dict())
         
         return player
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/players/{player_id}", response_model=Player)
-async def get_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database),
+                     cache: PlayerCache = Depends(get_player_cache)):
     """Get player by ID"""
     try:
-        player = await db.players.find_one({"id": player_id})
+        player = await cache.get(db, player_id)
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
         return Player(**player)
@@ -55,12 +66,14 @@ async def get_player(player_id: str, db: AsyncIOMotorDatabase = Depends(get_data
 
 
 @router.get("/players/username/{username}", response_model=Player)
-async def get_player_by_username(username: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_player_by_username(username: str, db: AsyncIOMotorDatabase = Depends(get_database),
+                                 cache: PlayerCache = Depends(get_player_cache)):
     """Get player by username"""
     try:
         player = await db.players.find_one({"username": username})
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
+        cache.put(player)
         return Player(**player)
     except HTTPException:
         raise
@@ -69,21 +82,24 @@ async def get_player_by_username(username: str, db: AsyncIOMotorDatabase = Depen
 
 
 @router.put("/players/{player_id}", response_model=Player)
-async def update_player(player_id: str, player_update: PlayerUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def update_player(player_id: str, player_update: PlayerUpdate, db: AsyncIOMotorDatabase = Depends(get_database),
+                        cache: PlayerCache = Depends(get_player_cache)):
     """Update player profile"""
     try:
         update_data = {k: v for k, v in player_update.dict().items() if v is not None}
         update_data["last_active"] = datetime.utcnow()
         
-        result = await db.players.update_one(
+        cache.invalidate(player_id)
+        updated_player = await db.players.find_one_and_update(
             {"id": player_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if not updated_player:
             raise HTTPException(status_code=404, detail="Player not found")
         
-        updated_player = await db.players.find_one({"id": player_id})
+        cache.put(updated_player)
         return Player(**updated_player)
     except HTTPException:
         raise
@@ -153,17 +169,18 @@ async def delete_game_state(player_id: str, db: AsyncIOMotorDatabase = Depends(g
 
 # Game Session Management
 @router.post("/sessions", response_model=ApiResponse)
-async def create_game_session(session_data: GameSessionCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def create_game_session(session_data: GameSessionCreate, db: AsyncIOMotorDatabase = Depends(get_database),
+                              cache: PlayerCache = Depends(get_player_cache)):
     """Record a completed game session"""
     try:
         session = GameSession(**session_data.dict())
         await db.game_sessions.insert_one(session.dict())
         
         # Update player statistics
-        await update_player_statistics(session_data.player_id, session_data, db)
+        await update_player_statistics(session_data.player_id, session_data, db, cache)
         
         # Update leaderboard if it's a high score
-        await update_leaderboard(session_data.player_id, session_data.score, session_data.snake_length, db)
+        await update_leaderboard(session_data.player_id, session_data.score, session_data.snake_length, db, cache)
         
         return ApiResponse(
             success=True,
@@ -253,11 +270,12 @@ async def get_player_statistics(player_id: str, db: AsyncIOMotorDatabase = Depen
 
 # Export/Import
 @router.get("/export/{player_id}", response_model=GameExport)
-async def export_player_data(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
+async def export_player_data(player_id: str, db: AsyncIOMotorDatabase = Depends(get_database),
+                             cache: PlayerCache = Depends(get_player_cache)):
     """Export all player data"""
     try:
         # Get player info
-        player = await db.players.find_one({"id": player_id})
+        player = await cache.get(db, player_id)
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
         
@@ -312,8 +330,16 @@ async def import_player_data(player_id: str, import_data: GameImport, db: AsyncI
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Cache
+@router.get("/cache/stats")
+async def get_cache_stats(cache: PlayerCache = Depends(get_player_cache)):
+    """Get player cache size and hit rates"""
+    return {"players": cache.stats()}
+
+
 # Helper Functions
-async def update_player_statistics(player_id: str, session_data: GameSessionCreate, db: AsyncIOMotorDatabase):
+async def update_player_statistics(player_id: str, session_data: GameSessionCreate, db: AsyncIOMotorDatabase,
+                                   cache: PlayerCache):
     """Update player statistics after a game session"""
     stats = await db.game_statistics.find_one({"player_id": player_id})
     
@@ -349,8 +375,9 @@ async def update_player_statistics(player_id: str, session_data: GameSessionCrea
         }
     )
     
-    # Also update player's highest score
-    await db.players.update_one(
+    # Also update player's highest score and refresh the cached profile
+    cache.invalidate(player_id)
+    updated_player = await db.players.find_one_and_update(
         {"id": player_id},
         {
             "$set": {
@@ -360,14 +387,18 @@ async def update_player_statistics(player_id: str, session_data: GameSessionCrea
                 "longest_snake": new_longest_snake,
                 "last_active": datetime.utcnow()
             }
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
+    if updated_player:
+        cache.put(updated_player)
 
 
-async def update_leaderboard(player_id: str, score: int, snake_length: int, db: AsyncIOMotorDatabase):
+async def update_leaderboard(player_id: str, score: int, snake_length: int, db: AsyncIOMotorDatabase,
+                             cache: PlayerCache):
     """Update leaderboard with new high score"""
     # Get player info
-    player = await db.players.find_one({"id": player_id})
+    player = await cache.get(db, player_id)
     if not player:
         return
     
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import load_environment
+
+
+class PlayerCache:
+    """In-process LRU cache of player documents keyed by player id.
+
+    Entries expire after ``ttl_seconds``. Concurrent misses for the same id
+    share a single ``players.find_one`` query instead of each issuing their own.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, db: AsyncIOMotorDatabase, player_id: str) -> Optional[Dict[str, Any]]:
+        """Return the player document, loading it from the database on a miss"""
+        entry = self._entries.get(player_id)
+        if entry is not None:
+            expires_at, player = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(player_id)
+                self.hits += 1
+                return player
+            del self._entries[player_id]
+
+        pending = self._inflight.get(player_id)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        load = asyncio.ensure_future(db.players.find_one({"id": player_id}))
+        self._inflight[player_id] = load
+        try:
+            player = await asyncio.shield(load)
+        finally:
+            owner = self._inflight.get(player_id) is load
+            if owner:
+                del self._inflight[player_id]
+
+        # Only store if no invalidate() or put() happened while the query was running
+        if owner and player is not None:
+            self.put(player)
+        return player
+
+    def put(self, player: Dict[str, Any]):
+        """Store a freshly read or written player document
+
+        Any load still in flight for the id loses ownership, so a query that
+        read the document before this write cannot overwrite it afterwards.
+        """
+        player_id = player["id"]
+        self._inflight.pop(player_id, None)
+        self._entries[player_id] = (time.monotonic() + self.ttl_seconds, player)
+        self._entries.move_to_end(player_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, player_id: str):
+        """Drop a cached player and detach any load still in flight for it"""
+        self._entries.pop(player_id, None)
+        self._inflight.pop(player_id, None)
+
+    def clear(self):
+        """Remove all cached players"""
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache size and hit rates"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared cache used by all game routes, created on first use
+_player_cache: Optional[PlayerCache] = None
+
+
+async def get_player_cache() -> PlayerCache:
+    """Dependency to get the shared player cache"""
+    global _player_cache
+    if _player_cache is None:
+        load_environment()
+        _player_cache = PlayerCache(
+            max_size=int(os.environ.get("PLAYER_CACHE_SIZE", 1024)),
+            ttl_seconds=float(os.environ.get("PLAYER_CACHE_TTL_SECONDS", 300)),
+        )
+    return _player_cache
@@ -1,31 +1,29 @@
-from fastapi import FastAPI, APIRouter, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from dotenv import load_dotenv
-from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from startup_profile import profiler
+
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List
 import uuid
 from datetime import datetime
 
+with profiler.phase("import fastapi"):
+    from fastapi import FastAPI, APIRouter, Request
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import FileResponse
+    from starlette.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, Field
+
 # Import game routes and database
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from game_routes import router as game_router
-from database import init_database, close_database
-
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+with profiler.phase("import game routes"):
+    from game_routes import router as game_router
+    from database import init_database, close_database, get_db, load_environment
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'neon_snake_db')]
+# Read backend/.env now so PORT and PROFILE_STARTUP set there are honored;
+# the Mongo client itself is still created on first use
+load_environment()
 
 # Create the main app without a prefix
 app = FastAPI(title="Neon Snake API", version="1.0.0")
@@ -52,12 +50,12 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    _ = await get_db().status_checks.insert_one(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
+    status_checks = await get_db().status_checks.find().to_list(1000)
     return [StatusCheck(**status_check) for status_check in status_checks]
 
 # Include the router in the main app
@@ -99,20 +97,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def record_first_request(request: Request, call_next):
+    """Report startup timings once the first request arrives"""
+    profiler.first_request()
+    return await call_next(request)
+
+if profiler.enabled:
+    app.middleware("http")(record_first_request)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
-    await init_database()
+    with profiler.phase("init database"):
+        await init_database()
+    profiler.ready()
     logger.info("Neon Snake API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connection on shutdown"""
     await close_database()
-    client.close()
 
 # Add this at the end of the file for running the server
 if __name__ == "__main__":
+    import argparse
     import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the Neon Snake API server")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and init timings when the first request is served")
+    parser.add_argument("--reload", dest="reload", action="store_true",
+                        help="restart the server on code changes")
+    parser.add_argument("--no-reload", dest="reload", action="store_false")
+    # Auto-reload is for local development; Render sets RENDER in its environment
+    parser.set_defaults(reload="RENDER" not in os.environ)
+    args = parser.parse_args()
+
+    if args.profile_startup and not profiler.enabled:
+        # Set in the environment so a reload subprocess also profiles itself
+        os.environ["PROFILE_STARTUP"] = "1"
+        app.middleware("http")(record_first_request)
+
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=True)
+    if args.reload:
+        uvicorn.run("server:app", host="0.0.0.0", port=port, reload=True)
+    else:
+        # Pass the app object so this module is not imported a second time
+        uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,77 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def _process_age() -> float:
+    """Seconds since this process was started by the OS (Linux only)"""
+    with open("/proc/self/stat") as f:
+        # The command name may contain spaces; fields after it are space separated
+        start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+    started = start_ticks / os.sysconf("SC_CLK_TCK")
+    return time.clock_gettime(time.CLOCK_BOOTTIME) - started
+
+
+# Reference point for all timings: the OS process start where available, so
+# interpreter startup and uvicorn's own imports are included. Otherwise fall
+# back to the first import of this module.
+try:
+    PROCESS_START = time.perf_counter() - _process_age()
+    START_LABEL = "process start"
+except (OSError, AttributeError, ValueError, IndexError):
+    PROCESS_START = time.perf_counter()
+    START_LABEL = "server import"
+
+
+class StartupProfiler:
+    """Records how long each startup phase takes, up to the first request served.
+
+    Timings are always collected (they are only a few perf_counter calls); the
+    report is printed when PROFILE_STARTUP is set, e.g. via ``--profile-startup``.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.ready_at = None
+        self.first_request_at = None
+
+    @property
+    def enabled(self) -> bool:
+        return os.environ.get("PROFILE_STARTUP", "").lower() in ("1", "true", "yes")
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a named startup phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def ready(self):
+        """Mark the point where the app is ready to serve traffic"""
+        self.ready_at = time.perf_counter()
+
+    def first_request(self):
+        """Mark the first request and print the report if profiling is enabled"""
+        if self.first_request_at is not None:
+            return
+        self.first_request_at = time.perf_counter()
+        if self.enabled:
+            print(self.report())
+
+    def report(self) -> str:
+        """Format the per-phase breakdown and time-to-first-request"""
+        lines = [f"Startup profile (pid {os.getpid()}, measured from {START_LABEL}):"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<32} {seconds * 1000:9.1f} ms")
+        if self.ready_at is not None:
+            ready = self.ready_at - PROCESS_START
+            lines.append(f"  {'time to ready':<32} {ready * 1000:9.1f} ms")
+        if self.first_request_at is not None:
+            total = self.first_request_at - PROCESS_START
+            lines.append(f"  {'time to first request':<32} {total * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+import database
+
+
+class StubCollection:
+    def __init__(self, fail=False):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+        self.fail = fail
+        self.doc = None
+
+    async def create_index(self, keys, **options):
+        if self.fail:
+            raise RuntimeError("E11000 duplicate key error")
+        name = database._index_name(keys)
+        self.indexes[name] = dict(options)
+        return name
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def find_one(self, query):
+        return self.doc
+
+    async def update_one(self, query, update, upsert=False):
+        self.doc = dict(update["$set"])
+
+
+class StubDatabase(dict):
+    def __missing__(self, name):
+        self[name] = StubCollection()
+        return self[name]
+
+    @property
+    def schema_meta(self):
+        return self["schema_meta"]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    stub = StubDatabase()
+    monkeypatch.setattr(database, "get_db", lambda: stub)
+    return stub
+
+
+def test_creates_indexes_and_records_hash(db):
+    assert asyncio.run(database.ensure_indexes()) is True
+    assert db.schema_meta.doc == {"hash": database.INDEX_SPEC_HASH}
+    assert db["players"].indexes["username_1"] == {"unique": True}
+
+
+def test_skips_when_hash_matches_and_indexes_exist(db):
+    asyncio.run(database.ensure_indexes())
+    assert asyncio.run(database.ensure_indexes()) is False
+
+
+def test_recreates_dropped_index_despite_matching_hash(db):
+    asyncio.run(database.ensure_indexes())
+    del db["players"].indexes["username_1"]
+    assert asyncio.run(database.ensure_indexes()) is True
+    assert "username_1" in db["players"].indexes
+
+
+def test_failed_index_leaves_hash_unrecorded(db):
+    db["players"] = StubCollection(fail=True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(database.ensure_indexes())
+    assert db.schema_meta.doc is None
+    assert "player_id_1" in db["leaderboard"].indexes
+
+
+def test_unknown_mode_falls_back_to_eager(db, monkeypatch, caplog):
+    monkeypatch.setenv("INDEX_INIT_MODE", "lazy")
+    asyncio.run(database.init_database())
+    assert "Unknown INDEX_INIT_MODE 'lazy'" in caplog.text
+    assert db.schema_meta.doc == {"hash": database.INDEX_SPEC_HASH}
@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from game_routes import create_player, update_player
+from models import PlayerCreate, PlayerUpdate
+from player_cache import PlayerCache
+
+
+class StubCollection:
+    """Minimal async stand-in for a Motor collection.
+
+    Enforces unique username and sparse unique email the way MongoDB does: a
+    document with ``email: None`` is indexed, one without the field is not.
+    """
+
+    def __init__(self, docs=None):
+        self.docs = [dict(doc) for doc in docs or []]
+        self.find_calls = 0
+        self.read_gate = None
+        self.write_gate = None
+
+    def _match(self, query):
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                return doc
+        return None
+
+    async def find_one(self, query):
+        self.find_calls += 1
+        doc = self._match(query)
+        snapshot = dict(doc) if doc else None
+        if self.read_gate is not None:
+            await self.read_gate.wait()
+        return snapshot
+
+    async def insert_one(self, doc):
+        for field, key_pattern in (("username", {"username": 1}), ("email", {"email": 1})):
+            if field in doc and any(field in other and other[field] == doc[field] for other in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key error",
+                                        code=11000, details={"keyPattern": key_pattern})
+        self.docs.append(dict(doc))
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        if self.write_gate is not None:
+            await self.write_gate.wait()
+        doc = self._match(query)
+        if doc is None:
+            return None
+        doc.update(update["$set"])
+        return dict(doc)
+
+
+class StubDatabase:
+    def __init__(self, players=None):
+        self.players = StubCollection(players)
+        self.game_statistics = StubCollection()
+
+
+def player_doc(player_id="p1", username="old"):
+    return {"id": player_id, "username": username, "total_games_played": 0}
+
+
+def test_hit_after_first_load():
+    async def scenario():
+        db = StubDatabase([player_doc()])
+        cache = PlayerCache()
+        assert (await cache.get(db, "p1"))["username"] == "old"
+        assert (await cache.get(db, "p1"))["username"] == "old"
+        return db, cache
+
+    db, cache = asyncio.run(scenario())
+    assert db.players.find_calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_concurrent_misses_share_one_query():
+    async def scenario():
+        db = StubDatabase([player_doc()])
+        db.players.read_gate = asyncio.Event()
+        cache = PlayerCache()
+        readers = [asyncio.ensure_future(cache.get(db, "p1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        db.players.read_gate.set()
+        return db, cache, await asyncio.gather(*readers)
+
+    db, cache, results = asyncio.run(scenario())
+    assert db.players.find_calls == 1
+    assert all(result["username"] == "old" for result in results)
+    stats = cache.stats()
+    assert (stats["coalesced"], stats["hit_rate"]) == (4, 0.0)
+
+
+def test_missing_player_is_not_cached():
+    async def scenario():
+        db = StubDatabase()
+        cache = PlayerCache()
+        assert await cache.get(db, "p1") is None
+        assert await cache.get(db, "p1") is None
+        return db
+
+    assert asyncio.run(scenario()).players.find_calls == 2
+
+
+def test_expired_entry_is_reloaded():
+    async def scenario():
+        db = StubDatabase([player_doc()])
+        cache = PlayerCache(ttl_seconds=0)
+        await cache.get(db, "p1")
+        await cache.get(db, "p1")
+        return db
+
+    assert asyncio.run(scenario()).players.find_calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PlayerCache(max_size=2)
+    cache.put(player_doc("p1"))
+    cache.put(player_doc("p2"))
+
+    async def touch_p1():
+        await cache.get(StubDatabase(), "p1")
+
+    asyncio.run(touch_p1())
+    cache.put(player_doc("p3"))
+
+    assert set(cache._entries) == {"p1", "p3"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_during_load_discards_result():
+    async def scenario():
+        db = StubDatabase([player_doc()])
+        db.players.read_gate = asyncio.Event()
+        cache = PlayerCache()
+        reader = asyncio.ensure_future(cache.get(db, "p1"))
+        await asyncio.sleep(0)
+        cache.invalidate("p1")
+        db.players.read_gate.set()
+        await reader
+        return cache
+
+    assert "p1" not in asyncio.run(scenario())._entries
+
+
+def test_concurrent_get_and_update_keeps_new_document():
+    async def scenario():
+        db = StubDatabase([player_doc()])
+        db.players.read_gate = asyncio.Event()
+        db.players.write_gate = asyncio.Event()
+        cache = PlayerCache()
+
+        # The update invalidates the entry, then waits before writing
+        updater = asyncio.ensure_future(update_player("p1", PlayerUpdate(username="new"), db=db, cache=cache))
+        await asyncio.sleep(0)
+
+        # A read starting now sees the old document but finishes after the write
+        reader = asyncio.ensure_future(cache.get(db, "p1"))
+        await asyncio.sleep(0)
+
+        db.players.write_gate.set()
+        await updater
+        db.players.read_gate.set()
+        await reader
+
+        db.players.read_gate = None
+        return await cache.get(db, "p1")
+
+    assert asyncio.run(scenario())["username"] == "new"
+
+
+def test_create_player_without_email_twice():
+    async def scenario():
+        db = StubDatabase()
+        cache = PlayerCache()
+        first = await create_player(PlayerCreate(username="a"), db=db, cache=cache)
+        second = await create_player(PlayerCreate(username="b"), db=db, cache=cache)
+        return db, cache, first, second
+
+    db, cache, first, second = asyncio.run(scenario())
+    assert len(db.players.docs) == 2
+    assert all("email" not in doc for doc in db.players.docs)
+    assert first.id in cache._entries and second.id in cache._entries
+
+
+@pytest.mark.parametrize("existing, new, detail", [
+    ({"username": "a"}, {"username": "a"}, "Username already exists"),
+    ({"username": "a", "email": "x@y.z"}, {"username": "b", "email": "x@y.z"}, "Email already exists"),
+])
+def test_create_player_duplicate_key(existing, new, detail):
+    async def scenario():
+        db = StubDatabase()
+        cache = PlayerCache()
+        await create_player(PlayerCreate(**existing), db=db, cache=cache)
+        await create_player(PlayerCreate(**new), db=db, cache=cache)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(scenario())
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == detail
@@ -7,6 +7,8 @@ class SnakeAPI {
             ? 'http://localhost:8000/api' 
             : `${window.location.origin}/api`;
         this.currentPlayer = null;
+        // How long a stored player is trusted before re-checking it on the server
+        this.playerVerifyIntervalMs = 6 * 60 * 60 * 1000;
     }
 
     async request(endpoint, options = {}) {
@@ -50,6 +52,7 @@ class SnakeAPI {
         
         this.currentPlayer = player;
         localStorage.setItem('neonSnakePlayer', JSON.stringify(player));
+        this.markPlayerVerified();
         return player;
     }
 
@@ -203,14 +206,18 @@ class SnakeAPI {
         const storedPlayer = localStorage.getItem('neonSnakePlayer');
         if (storedPlayer) {
             this.currentPlayer = JSON.parse(storedPlayer);
+            // Skip the server round trip if the player was verified recently
+            if (this.isPlayerVerificationFresh()) {
+                return this.currentPlayer;
+            }
             try {
                 // Verify player still exists on server
                 await this.getPlayer(this.currentPlayer.id);
+                this.markPlayerVerified();
                 return this.currentPlayer;
             } catch (error) {
                 // Player doesn't exist on server, remove from localStorage
-                localStorage.removeItem('neonSnakePlayer');
-                this.currentPlayer = null;
+                this.clearCurrentPlayer();
             }
         }
 
@@ -234,6 +241,16 @@ class SnakeAPI {
     clearCurrentPlayer() {
         this.currentPlayer = null;
         localStorage.removeItem('neonSnakePlayer');
+        localStorage.removeItem('neonSnakePlayerVerifiedAt');
+    }
+
+    markPlayerVerified() {
+        localStorage.setItem('neonSnakePlayerVerifiedAt', Date.now().toString());
+    }
+
+    isPlayerVerificationFresh() {
+        const verifiedAt = parseInt(localStorage.getItem('neonSnakePlayerVerifiedAt') || '0');
+        return Date.now() - verifiedAt < this.playerVerifyIntervalMs;
     }
 
     // Utility methods for backwards compatibility